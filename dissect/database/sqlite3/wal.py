@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import logging
+import mmap
 import os
 import struct
-from functools import cached_property, lru_cache
+from functools import cached_property
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, BinaryIO
 
@@ -21,6 +22,9 @@ WAL_HEADER_MAGIC_LE = 0x377F0682
 WAL_HEADER_MAGIC_BE = 0x377F0683
 WAL_HEADER_MAGIC = {WAL_HEADER_MAGIC_LE, WAL_HEADER_MAGIC_BE}
 
+# Precompiled layout of ``c_sqlite3.wal_frame``, frame headers are always big-endian
+_FRAME_HEADER = struct.Struct(">6I")
+
 
 class WAL:
     def __init__(self, fh: Path | BinaryIO):
@@ -39,29 +43,66 @@ class WAL:
             raise InvalidDatabase("Invalid WAL header magic")
 
         self.checksum_endian = "<" if self.header.magic == WAL_HEADER_MAGIC_LE else ">"
+        self.salts = (self.header.salt1, self.header.salt2)
+
+        self.header_size = len(c_sqlite3.wal_header)
+        self.frame_header_size = len(c_sqlite3.wal_frame)
+        self.page_size = self.header.page_size
+        self.frame_size = self.frame_header_size + self.page_size
+
+        # Precompile the checksummed layouts (the first 8 bytes of a frame header and the page data), these use the
+        # checksum byte order rather than the big-endian order of ``_FRAME_HEADER``
+        self._checksum_header_struct = struct.Struct(f"{self.checksum_endian}2I")
+        self._checksum_page_struct = struct.Struct(f"{self.checksum_endian}{self.page_size // 4}I")
+
+        # Memory map the WAL file if we opened it ourselves, so reading frames doesn't require a seek and read
+        # for every access. Caller owned file handles are left alone, as they may be shared and outlive this WAL.
+        self._mm = None
+        if self.path is not None:
+            try:
+                self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                pass
 
-        self.frame = lru_cache(1024)(self.frame)
+        # Frames are usually first read front to back, so let the kernel read ahead (not available on all platforms)
+        if self._mm is not None and hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._mm.madvise(mmap.MADV_SEQUENTIAL)
 
     def close(self) -> None:
         """Close the WAL."""
-        # Only close WAL handle if we opened it using a path
+        # Only close WAL handle (and its memory map) if we opened it using a path
         if self.path is not None:
+            if self._mm is not None:
+                self._mm.close()
             self.fh.close()
 
+    def _read(self, offset: int, size: int) -> bytes:
+        """Read ``size`` bytes from ``offset`` in the WAL file."""
+        if self._mm is not None:
+            return self._mm[offset : offset + size]
+
+        # All reads seek to an absolute offset first, so the file position doesn't need to be preserved
+        self.fh.seek(offset)
+        return self.fh.read(size)
+
     def frame(self, frame_idx: int) -> Frame:
-        frame_size = len(c_sqlite3.wal_frame) + self.header.page_size
-        offset = len(c_sqlite3.wal_header) + frame_idx * frame_size
-        return Frame(self, offset)
+        return Frame(self, self.header_size + frame_idx * self.frame_size, frame_idx)
 
     def frames(self) -> Iterator[Frame]:
+        offset = self.header_size
+
         frame_idx = 0
         while True:
             try:
-                yield self.frame(frame_idx)
-                frame_idx += 1
-            except EOFError:  # noqa: PERF203
+                frame = Frame(self, offset, frame_idx)
+            except EOFError:
                 break
 
+            yield frame
+
+            frame_idx += 1
+            offset += self.frame_size
+
     @cached_property
     def commits(self) -> list[Commit]:
         """Return all commits in the WAL file.
@@ -74,19 +115,26 @@ class WAL:
         """
         commits = []
         frames = []
+        page_map = {}
 
         for frame in self.frames():
             frames.append(frame)
+            page_map[frame.page_number] = frame
 
             # A commit record has a page_count header greater than zero
             if frame.page_count > 0:
-                commits.append(Commit(self, frames))
+                commits.append(Commit(self, frames, page_map))
                 frames = []
+                page_map = {}
 
         if frames:
             # TODO: Do we want to track these somewhere?
             log.warning("Found leftover %d frames after the last WAL commit", len(frames))
 
+        # After collecting the commits, pages are looked up by page number
+        if self._mm is not None and hasattr(mmap, "MADV_RANDOM"):
+            self._mm.madvise(mmap.MADV_RANDOM)
+
         return commits
 
     @cached_property
@@ -109,50 +157,117 @@ class WAL:
             # Keep the most recent commit for each salt1 (later commits overwrite).
             checkpoints_map[salt1] = commit
 
-        return [checkpoints_map[salt] for salt in sorted(checkpoints_map.keys())]
+        return [checkpoint for _, checkpoint in sorted(checkpoints_map.items())]
+
+    @cached_property
+    def header_checksum(self) -> tuple[int, int]:
+        """Return the checksum of the WAL header, which seeds the checksum of the first frame."""
+        return checksum(self.header.dumps()[:24], self.checksum_endian)
+
+    @cached_property
+    def _checksums(self) -> list[tuple[int, int]]:
+        """Return the running checksum after each frame in the WAL file.
+
+        The checksum of each frame continues from the checksum of the previous frame, starting at the
+        checksum of the WAL header. Calculating them all in a single pass means validating every frame
+        only reads the WAL file once.
+
+        References:
+            - https://sqlite.org/fileformat2.html#wal_file_format
+        """
+        checksums = []
+        value = self.header_checksum
+
+        for buf in self._frame_buffers():
+            # The checksum covers the first 8 bytes of the frame header and the page data
+            value = _checksum(self._checksum_header_struct.unpack_from(buf), value)
+            value = _checksum(self._checksum_page_struct.unpack_from(buf, self.frame_header_size), value)
+            checksums.append(value)
+
+        return checksums
+
+    def _frame_buffers(self) -> Iterator[memoryview | bytes]:
+        """Yield the raw buffer of every complete frame in the WAL file."""
+        offset = self.header_size
+
+        if self._mm is not None:
+            # Slicing a memoryview of the memory map doesn't copy the frame data
+            with memoryview(self._mm) as view:
+                while offset + self.frame_size <= len(view):
+                    yield view[offset : offset + self.frame_size]
+                    offset += self.frame_size
+        else:
+            while len(buf := self._read(offset, self.frame_size)) == self.frame_size:
+                yield buf
+                offset += self.frame_size
 
 
 class Frame:
-    def __init__(self, wal: WAL, offset: int):
+    __slots__ = ("_header", "_values", "fh", "idx", "offset", "wal")
+
+    def __init__(self, wal: WAL, offset: int, idx: int | None = None):
         self.wal = wal
         self.offset = offset
+        self.idx = (offset - wal.header_size) // wal.frame_size if idx is None else idx
 
         self.fh = wal.fh
 
-        self.fh.seek(offset)
-        self.header = c_sqlite3.wal_frame(self.fh)
+        buf = wal._read(offset, wal.frame_header_size)
+        if len(buf) != wal.frame_header_size:
+            raise EOFError("Unexpected end of WAL file while reading frame header")
+
+        # Only unpack the raw header values (in ``c_sqlite3.wal_frame`` order) here, most frames are only
+        # ever inspected for their page number, page count, salts and checksums
+        self._values = _FRAME_HEADER.unpack(buf)
+        self._header = None
 
     def __repr__(self) -> str:
         return f"<Frame page_number={self.page_number} page_count={self.page_count}>"
 
+    @property
+    def header(self) -> c_sqlite3.wal_frame:
+        """Frame header, parsed on first access."""
+        if self._header is None:
+            self._header = c_sqlite3.wal_frame(*self._values)
+        return self._header
+
     @property
     def valid(self) -> bool:
-        salt1_match = self.header.salt1 == self.wal.header.salt1
-        salt2_match = self.header.salt2 == self.wal.header.salt2
+        return self._values[2:4] == self.wal.salts
 
-        return salt1_match and salt2_match
+    def validate_checksum(self) -> bool:
+        """Return whether the checksum in the frame header matches the running checksum of the WAL file."""
+        checksums = self.wal._checksums
+        # The page of the last frame may be truncated, in which case there is no checksum to compare against
+        return self.idx < len(checksums) and checksums[self.idx] == self._values[4:6]
 
     @property
     def data(self) -> bytes:
-        self.fh.seek(self.offset + len(c_sqlite3.wal_frame))
-        return self.fh.read(self.wal.header.page_size)
+        return self.wal._read(self.offset + self.wal.frame_header_size, self.wal.page_size)
 
     @property
     def page_number(self) -> int:
-        return self.header.page_number
+        return self._values[0]
 
     @property
     def page_count(self) -> int:
-        return self.header.page_count
+        return self._values[1]
 
 
 class _FrameCollection:
     """Convenience class to keep track of a collection of frames that were committed together."""
 
-    def __init__(self, wal: WAL, frames: list[Frame]):
+    __slots__ = ("frames", "page_map", "wal")
+
+    def __init__(self, wal: WAL, frames: list[Frame], page_map: dict[int, Frame] | None = None):
         self.wal = wal
         self.frames = frames
 
+        # Allow callers that already built the page map to skip building it again
+        if page_map is None:
+            page_map = {frame.page_number: frame for frame in frames}
+        self.page_map = page_map
+
     def __contains__(self, page: int) -> bool:
         return page in self.page_map
 
@@ -162,10 +277,6 @@ class _FrameCollection:
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__} frames={len(self.frames)}>"
 
-    @cached_property
-    def page_map(self) -> dict[int, Frame]:
-        return {frame.page_number: frame for frame in self.frames}
-
     def get(self, page: int, default: Any = None) -> Frame:
         return self.page_map.get(page, default)
 
@@ -178,6 +289,8 @@ class Checkpoint(_FrameCollection):
         - https://sqlite.org/fileformat2.html#wal_file_format
     """
 
+    __slots__ = ()
+
 
 class Commit(_FrameCollection):
     """A commit is a collection of frames that were committed together.
@@ -186,14 +299,29 @@ class Commit(_FrameCollection):
         - https://sqlite.org/fileformat2.html#wal_file_format
     """
 
+    __slots__ = ()
+
+
+def checksum(buf: bytes, endian: str = ">", seed: tuple[int, int] = (0, 0)) -> tuple[int, int]:
+    """Calculate the SQLite3 WAL checksum of ``buf``.
+
+    The checksum of a WAL frame continues from the checksum of the previous frame (or the WAL header),
+    which can be passed as ``seed``.
+
+    References:
+        - https://sqlite.org/fileformat2.html#wal_file_format
+    """
+    return _checksum(struct.unpack(f"{endian}{len(buf) // 4}I", buf), seed)
+
 
-def checksum(buf: bytes, endian: str = ">") -> tuple[int, int]:
-    s0 = s1 = 0
-    num_ints = len(buf) // 4
-    arr = struct.unpack(f"{endian}{num_ints}I", buf)
+def _checksum(values: tuple[int, ...], seed: tuple[int, int]) -> tuple[int, int]:
+    """Calculate the SQLite3 WAL checksum of already unpacked 32-bit integers."""
+    s0, s1 = seed
 
-    for int_num in range(0, num_ints, 2):
-        s0 = (s0 + (arr[int_num] + s1)) & 0xFFFFFFFF
-        s1 = (s1 + (arr[int_num + 1] + s0)) & 0xFFFFFFFF
+    # Consume the integers in pairs, which avoids indexing into the tuple on every iteration
+    it = iter(values)
+    for x0, x1 in zip(it, it, strict=True):
+        s0 = (s0 + x0 + s1) & 0xFFFFFFFF
+        s1 = (s1 + x1 + s0) & 0xFFFFFFFF
 
     return s0, s1
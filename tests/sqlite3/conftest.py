@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import shutil
+import sqlite3
 from typing import TYPE_CHECKING
 
 import pytest
@@ -23,3 +25,29 @@ def sqlite_wal() -> Path:
 @pytest.fixture
 def empty_db() -> Path:
     return absolute_path("_data/sqlite3/empty.sqlite")
+
+
+@pytest.fixture
+def generated_db(tmp_path: Path) -> Path:
+    """Generate a SQLite3 database with uncheckpointed changes in its WAL file, so no LFS test data is needed."""
+    conn = sqlite3.connect(tmp_path / "db.sqlite", isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA wal_autocheckpoint=-1;")
+
+    conn.execute("CREATE TABLE test (id INTEGER PRIMARY KEY AUTOINCREMENT, value INTEGER NOT NULL)")
+    conn.execute("PRAGMA wal_checkpoint(FULL);")
+
+    for value in range(60):
+        conn.execute("INSERT INTO test (value) VALUES (?)", (value,))
+
+    # Closing the connection checkpoints and removes the WAL file, so copy the files first
+    shutil.copy(tmp_path / "db.sqlite", tmp_path / "test.sqlite")
+    shutil.copy(tmp_path / "db.sqlite-wal", tmp_path / "test.sqlite-wal")
+    conn.close()
+
+    return tmp_path / "test.sqlite"
+
+
+@pytest.fixture
+def generated_wal(generated_db: Path) -> Path:
+    return generated_db.with_name(f"{generated_db.name}-wal")
@@ -1,27 +1,42 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from io import BytesIO
+from typing import TYPE_CHECKING, BinaryIO
 
 import pytest
 
-from dissect.database.sqlite3 import sqlite3
+from dissect.database.sqlite3 import WAL, sqlite3
+from dissect.database.sqlite3.wal import Frame
 
 if TYPE_CHECKING:
     from pathlib import Path
 
 
+def _open_wal(path: Path, wal_type: str) -> Path | BinaryIO:
+    if wal_type == "path":
+        return path
+    if wal_type == "fh":
+        return path.open("rb")
+    # A BytesIO can't be memory mapped, so this covers reading through seek and read
+    return BytesIO(path.read_bytes())
+
+
 @pytest.mark.parametrize(
     ("db_as_path"),
     [pytest.param(True, id="db_as_path"), pytest.param(False, id="db_as_fh")],
 )
 @pytest.mark.parametrize(
-    ("wal_as_path"),
-    [pytest.param(True, id="wal_as_path"), pytest.param(False, id="wal_as_fh")],
+    ("wal_type"),
+    [
+        pytest.param("path", id="wal_as_path"),
+        pytest.param("fh", id="wal_as_fh"),
+        pytest.param("bytesio", id="wal_as_bytesio"),
+    ],
 )
-def test_sqlite_wal(sqlite_db: Path, sqlite_wal: Path, db_as_path: bool, wal_as_path: bool) -> None:
+def test_sqlite_wal(sqlite_db: Path, sqlite_wal: Path, db_as_path: bool, wal_type: str) -> None:
     db = sqlite3.SQLite3(
         sqlite_db if db_as_path else sqlite_db.open("rb"),
-        sqlite_wal if wal_as_path else sqlite_wal.open("rb"),
+        _open_wal(sqlite_wal, wal_type),
         checkpoint=1,
     )
     _assert_checkpoint_1(db)
@@ -30,7 +45,7 @@ def test_sqlite_wal(sqlite_db: Path, sqlite_wal: Path, db_as_path: bool, wal_as_
 
     db = sqlite3.SQLite3(
         sqlite_db if db_as_path else sqlite_db.open("rb"),
-        sqlite_wal if wal_as_path else sqlite_wal.open("rb"),
+        _open_wal(sqlite_wal, wal_type),
         checkpoint=2,
     )
     _assert_checkpoint_2(db)
@@ -39,7 +54,7 @@ def test_sqlite_wal(sqlite_db: Path, sqlite_wal: Path, db_as_path: bool, wal_as_
 
     db = sqlite3.SQLite3(
         sqlite_db if db_as_path else sqlite_db.open("rb"),
-        sqlite_wal if wal_as_path else sqlite_wal.open("rb"),
+        _open_wal(sqlite_wal, wal_type),
         checkpoint=3,
     )
     _assert_checkpoint_3(db)
@@ -47,6 +62,63 @@ def test_sqlite_wal(sqlite_db: Path, sqlite_wal: Path, db_as_path: bool, wal_as_
     db.close()
 
 
+@pytest.mark.parametrize(
+    ("wal_type"),
+    [
+        pytest.param("path", id="wal_as_path"),
+        pytest.param("fh", id="wal_as_fh"),
+        pytest.param("bytesio", id="wal_as_bytesio"),
+    ],
+)
+def test_sqlite_wal_shared(generated_db: Path, generated_wal: Path, wal_type: str) -> None:
+    db = sqlite3.SQLite3(generated_db, _open_wal(generated_wal, wal_type))
+    assert len(list(next(db.tables()).rows())) == 60
+
+    # Closing a database that shares the WAL must not break reading a caller owned WAL file handle
+    checkpoint_db = sqlite3.SQLite3(generated_db, db.wal, checkpoint=0)
+    checkpoint_db.close()
+
+    if wal_type != "path":
+        db.page.cache_clear()
+        assert len(list(next(db.tables()).rows())) == 60
+
+    db.close()
+
+
+@pytest.mark.parametrize(
+    ("wal_type"),
+    [
+        pytest.param("path", id="wal_as_path"),
+        pytest.param("fh", id="wal_as_fh"),
+        pytest.param("bytesio", id="wal_as_bytesio"),
+    ],
+)
+def test_sqlite_wal_generated_checksum(generated_wal: Path, wal_type: str) -> None:
+    wal = WAL(_open_wal(generated_wal, wal_type))
+
+    # All frames were written in a single WAL generation, so they all chain from the WAL header checksum
+    frames = list(wal.frames())
+    assert len(frames) == 120
+    assert all(frame.validate_checksum() for frame in frames)
+
+    assert wal.header_checksum == (wal.header.checksum1, wal.header.checksum2)
+    assert Frame(wal, frames[10].offset).idx == 10
+
+    wal.close()
+
+
+def test_sqlite_wal_truncated_checksum(generated_wal: Path) -> None:
+    buf = generated_wal.read_bytes()
+    page_size = WAL(BytesIO(buf)).page_size
+    wal = WAL(BytesIO(buf[: -page_size // 2]))
+
+    # The header of the last frame is still complete, but half of its page is missing
+    frames = list(wal.frames())
+    assert len(frames) == 120
+    assert all(frame.validate_checksum() for frame in frames[:-1])
+    assert not frames[-1].validate_checksum()
+
+
 def _assert_checkpoint_1(s: sqlite3.SQLite3) -> None:
     # After the first checkpoint the "after checkpoint" entries are present
     table = next(iter(s.tables()))
@@ -162,3 +234,17 @@ def _assert_checkpoint_3(s: sqlite3.SQLite3) -> None:
     assert rows[9].id == 11
     assert rows[9].name == "second checkpoint"
     assert rows[9].value == 101
+
+
+def test_sqlite_wal_checksum(sqlite_wal: Path) -> None:
+    wal = WAL(sqlite_wal)
+
+    frames = list(wal.frames())
+    assert len(frames) == 17
+
+    # Only the frames of the current WAL generation chain from the checksum in the WAL header
+    assert [frame.validate_checksum() for frame in frames] == [frame.valid for frame in frames]
+    assert frames[0].validate_checksum()
+    assert not frames[-1].validate_checksum()
+
+    wal.close()